@@ -6,17 +6,29 @@ macOS version
 v1.250203
 """
 
+import contextlib
+import functools
+import io
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
 import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 warnings.filterwarnings("ignore")
 
 import gradio as gr
-import torch
-import whisperx
+import numpy as np
+
+# torch and whisperx (which pulls in pyannote, transformers, ...) take many
+# seconds to import, so they are imported on first use rather than here.
+# That way the UI comes up immediately and the first transcription pays the
+# import cost once.
 
 # Configuration
 TOKEN_FILE = Path.home() / ".audioscribe_token.txt"
@@ -48,29 +60,354 @@ LANGUAGES = {
 }
 
 # Model options
-MODELS = ["tiny", "base", "small", "medium", "large-v2", "large-v3"]
+# Any model can run with int8 weights by picking the int8 compute type below.
+MODELS = ["tiny", "base", "small", "medium", "large-v2", "large-v3", "large-v3-turbo"]
+
+# CTranslate2 compute types (weights/activations precision). The float16
+# types need CUDA; on a Mac they fall back to the device default.
+COMPUTE_TYPES = ["auto", "int8", "int8_float16", "float16", "float32"]
 
 # Supported audio formats
 AUDIO_FORMATS = [".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg", ".wma"]
 
+# Whisper batch sizes on a 16 GB CUDA GPU, scaled by available VRAM
+_CUDA_BATCH_SIZES = {"tiny": 64, "base": 48, "small": 32, "medium": 16, "large": 8}
+
+# Loaded (and compiled) diarization pipelines reused across transcriptions so
+# the torch.compile warmup cost is only paid once per process.
+_DIARIZE_CACHE = {}  # (hf_token, device) -> DiarizationPipeline
+
+# Transcripts are saved on a background thread so a slow Downloads drive
+# (HDD, cloud-synced folder) never delays the result shown in the UI.
+_WRITER = ThreadPoolExecutor(max_workers=1)
+_pending_saves = []  # futures of background saves not yet checked for errors
+_SAVE_FAILED = "Earlier save failed — "
+
+# On CUDA, diarization runs on this worker while alignment runs on the
+# request thread.
+_DIARIZER = ThreadPoolExecutor(max_workers=1)
+
+
+@functools.lru_cache(maxsize=None)
+def load_torch():
+    """Import torch on first use and apply the global settings."""
+    import torch
+
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.set_float32_matmul_precision("high")
+    return torch
+
 
+@functools.lru_cache(maxsize=None)
 def get_device():
     """Determine the best available device for inference.
 
     Note: MPS (Apple Silicon GPU) is not supported by ctranslate2/whisperx yet,
     so we fall back to CPU on Mac. CUDA is supported for NVIDIA GPUs.
     """
-    if torch.cuda.is_available():
+    if load_torch().cuda.is_available():
         return "cuda"
     # MPS not supported by ctranslate2, use CPU on Mac
     return "cpu"
 
 
+def get_torch_device():
+    """Determine the device for the PyTorch models (alignment, diarization).
+
+    Unlike the ctranslate2 Whisper model, these can run on the Apple Silicon
+    GPU through MPS.
+    """
+    torch = load_torch()
+
+    device = get_device()
+    if device == "cpu" and torch.backends.mps.is_available():
+        return "mps"
+    return device
+
+
 def get_compute_type(device):
-    """Get appropriate compute type for the device."""
+    """Get appropriate compute type for the device.
+
+    On CPU, int8 lets CTranslate2 use its int8 GEMM kernels, cutting weight
+    bandwidth ~4x versus float32.
+    """
     if device == "cuda":
         return "float16"
-    return "float32"
+    if device == "mps":
+        return "int8_float16"
+    return "int8"
+
+
+def _pick_batch_size(device, model_size):
+    """Pick a Whisper batch size for the device, model size and GPU memory."""
+    torch = load_torch()
+
+    family = model_size.split("-")[0]
+    base = _CUDA_BATCH_SIZES.get(family, 8)
+    if device == "cuda":
+        total_gb = torch.cuda.get_device_properties(0).total_memory / 1024**3
+        return max(1, int(base * min(total_gb / 16, 2.0)))
+    if device == "mps":
+        return max(1, base // 2)
+    # CPU (the only Whisper path on a Mac): the batch size used before GPU
+    # sizing was added — batched CPU decoding is faster than unbatched
+    return 16
+
+
+def _pick_diarize_batch_size(device):
+    """Pick the pyannote segmentation/embedding batch size for the device."""
+    if device == "cuda":
+        return 32
+    if device == "mps":
+        return 16
+    return 1
+
+
+def transcribe_with_retry(model, audio, batch_size, device):
+    """Run model.transcribe, halving the batch size on out-of-memory errors."""
+    torch = load_torch()
+
+    while True:
+        try:
+            return model.transcribe(audio, batch_size=batch_size)
+        except RuntimeError as e:
+            if "out of memory" not in str(e).lower() or batch_size == 1:
+                raise
+            batch_size //= 2
+            print(f"Out of memory, retrying with batch size {batch_size}...")
+            if device == "cuda":
+                torch.cuda.empty_cache()
+
+
+def compile_module(module, device, example_input):
+    """Wrap a torch module with torch.compile on CUDA.
+
+    torch.compile is lazy, so one forward pass on example_input (under the
+    same fp16 autocast diarization uses) forces compilation here, where a
+    failure can still fall back to the eager module. dynamic=True keeps the
+    smaller, per-file tail batch from triggering a recompile. Returns the
+    module unchanged on CPU/MPS or if compilation fails.
+    """
+    torch = load_torch()
+
+    if device != "cuda":
+        return module
+    try:
+        compiled = torch.compile(module, dynamic=True, fullgraph=False)
+        with torch.inference_mode(), half_precision(device):
+            compiled(example_input)
+        return compiled
+    except Exception as e:
+        print(f"torch.compile failed, using eager mode: {e}")
+        return module
+
+
+def warm_up(model, device):
+    """Run one encoder pass on 30 s of silence right after loading.
+
+    CTranslate2 picks its CUDA kernels and sizes its allocator on the first
+    call, so doing that here keeps the cost off the first real batch.
+    """
+    if device != "cuda":
+        return
+    try:
+        whisper_model = model.model
+        extractor = whisper_model.feature_extractor
+        silence = np.zeros(extractor.n_samples, dtype=np.float32)
+        features = extractor(silence)[:, : extractor.nb_max_frames]
+        whisper_model.encode(features)
+    except Exception as e:
+        print(f"Model warmup skipped: {e}")
+
+
+@functools.lru_cache(maxsize=2)
+def load_whisper_model(model_size, device, compute_type, language,
+                       vad_method="pyannote"):
+    """Load a WhisperX model, keeping the two most recently used in memory.
+
+    vad_method="silero" swaps WhisperX's pyannote VAD for the much smaller
+    Silero model, which makes the voice-detection pass close to free.
+
+    CTranslate2 rejects an explicitly requested compute type the device
+    can't run (e.g. float16 on CPU), so that falls back to the device
+    default.
+    """
+    import whisperx
+
+    def load(compute_type):
+        return whisperx.load_model(
+            model_size,
+            device,
+            compute_type=compute_type,
+            language=language,
+            vad_method=vad_method,
+        )
+
+    try:
+        model = load(compute_type)
+    except ValueError as e:
+        fallback = get_compute_type(device)
+        if compute_type == fallback:
+            raise
+        print(f"Compute type {compute_type} not supported here ({e}), using {fallback}")
+        model = load(fallback)
+    warm_up(model, device)
+    return model
+
+
+@functools.lru_cache(maxsize=4)
+def load_align_model(language_code, device):
+    """Load the alignment model for a language.
+
+    The four most recently used languages stay in memory, so repeat runs
+    skip the disk load without letting a multilingual session fill up VRAM.
+    The model is not compiled: it runs once per segment and every segment
+    has a different length, so each call would recompile.
+    """
+    import whisperx
+
+    model_a, metadata = whisperx.load_align_model(
+        language_code=language_code, device=device
+    )
+    return model_a, metadata
+
+
+def load_diarize_model(hf_token, device):
+    """Load the diarization pipeline, reusing a cached copy.
+
+    The pyannote pipeline itself is not a torch module, so its segmentation
+    and embedding networks are compiled individually. Both take batches of
+    fixed-length chunks; only the batch size of the last batch varies, which
+    the dynamic compile absorbs.
+    """
+    import whisperx
+
+    key = (hf_token, device)
+    if key not in _DIARIZE_CACHE:
+        diarize_model = whisperx.DiarizationPipeline(
+            hf_token=hf_token, device=device
+        )
+        pipeline = diarize_model.model
+        batch_size = _pick_diarize_batch_size(device)
+        pipeline.segmentation_batch_size = batch_size
+        pipeline.embedding_batch_size = batch_size
+        # Example batch of chunks, shaped (batch, channel, samples)
+        segmentation = getattr(pipeline, "_segmentation", None)
+        duration = getattr(segmentation, "duration", None) or 10.0
+        example = load_torch().zeros(
+            2, 1, int(duration * 16000), device=device
+        )
+        if segmentation is not None:
+            segmentation.model = compile_module(segmentation.model, device, example)
+        embedding = getattr(pipeline, "_embedding", None)
+        if embedding is not None and hasattr(embedding, "model_"):
+            embedding.model_ = compile_module(embedding.model_, device, example)
+        _DIARIZE_CACHE[key] = diarize_model
+    return _DIARIZE_CACHE[key]
+
+
+def load_audio(path, device):
+    """Decode an audio file to 16 kHz mono float32.
+
+    ffmpeg downmixes and resamples while streaming and emits float32
+    directly, so only the 16 kHz mono samples are ever held in memory
+    (~460 MB for 2 hours), with no int16 intermediate to convert. Only the
+    tensor for alignment/diarization is copied to the device, so the upload
+    overlaps transcription. Falls back to whisperx.load_audio if the pipe
+    fails.
+
+    Returns (numpy array for WhisperX, 1-D tensor on the device).
+    """
+    import whisperx
+    torch = load_torch()
+
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+        "-f", "f32le", "-ac", "1", "-ar", "16000", "-",
+    ]
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        buf = bytearray()
+        while chunk := proc.stdout.read(1 << 20):
+            buf += chunk
+        proc.stdout.close()
+        if proc.wait() != 0 or not buf:
+            raise RuntimeError(f"ffmpeg exited with code {proc.returncode}")
+        # A bytearray is writable, so the array and tensor share it
+        audio = np.frombuffer(buf, dtype=np.float32)
+    except Exception as e:
+        print(f"Streaming decode failed ({e}), using whisperx.load_audio...")
+        audio = whisperx.load_audio(path)
+
+    audio_tensor = torch.from_numpy(audio)
+    if device == "cuda":
+        audio_tensor = audio_tensor.pin_memory()
+    return audio, audio_tensor.to(device, non_blocking=True)
+
+
+def half_precision(device):
+    """Return an fp16 autocast context on CUDA/MPS, a no-op elsewhere."""
+    torch = load_torch()
+
+    if device in ("cuda", "mps"):
+        try:
+            return torch.autocast(device, dtype=torch.float16)
+        except Exception:
+            pass  # autocast not supported for this device by this torch
+    return contextlib.nullcontext()
+
+
+def align(segments, model_a, metadata, audio_tensor, device):
+    """Run whisperx.align in fp16 on GPU, falling back to fp32 on failure."""
+    import whisperx
+
+    try:
+        with half_precision(device):
+            return whisperx.align(
+                segments, model_a, metadata, audio_tensor, device,
+                return_char_alignments=False,
+            )
+    except Exception as e:
+        if device not in ("cuda", "mps"):
+            raise
+        print(f"fp16 alignment failed ({e}), retrying in fp32...")
+        return whisperx.align(
+            segments, model_a, metadata, audio_tensor, device,
+            return_char_alignments=False,
+        )
+
+
+def diarize(diarize_model, waveform):
+    """Run speaker diarization on a pre-loaded (1, samples) waveform tensor.
+
+    Passing the waveform dict straight to the pyannote pipeline skips
+    pyannote's own audio decoding and keeps feature extraction on the
+    model's device. Returns the DataFrame whisperx.assign_word_speakers
+    expects.
+
+    pyannote 3.1+ computes speaker embeddings in PyTorch (the ONNX Runtime
+    embedding was dropped after 3.0), so an on-device waveform is all it
+    takes to avoid host/device copies between chunks.
+    """
+    import pandas as pd
+
+    audio_input = {"waveform": waveform, "sample_rate": 16000}
+    device = waveform.device.type
+    try:
+        with half_precision(device):
+            annotation = diarize_model.model(audio_input)
+    except Exception as e:
+        if device not in ("cuda", "mps"):
+            raise
+        print(f"fp16 diarization failed ({e}), retrying in fp32...")
+        annotation = diarize_model.model(audio_input)
+    diarize_df = pd.DataFrame(
+        annotation.itertracks(yield_label=True),
+        columns=["segment", "label", "speaker"],
+    )
+    diarize_df["start"] = diarize_df["segment"].apply(lambda x: x.start)
+    diarize_df["end"] = diarize_df["segment"].apply(lambda x: x.end)
+    return diarize_df
 
 
 def load_token():
@@ -86,42 +423,156 @@ def save_token(token):
     return "Token saved successfully!"
 
 
-def format_timestamp(seconds):
-    """Convert seconds to HH:MM:SS format."""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    if hours > 0:
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-    return f"{minutes:02d}:{secs:02d}"
+def format_timestamps(seconds):
+    """Convert a sequence of seconds to HH:MM:SS (or MM:SS) strings.
+
+    The arithmetic is done once over the whole array rather than per segment.
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    hours = (seconds // 3600).astype(np.int64).tolist()
+    minutes = ((seconds % 3600) // 60).astype(np.int64).tolist()
+    secs = (seconds % 60).astype(np.int64).tolist()
+    return [
+        f"{h:02d}:{m:02d}:{s:02d}" if h > 0 else f"{m:02d}:{s:02d}"
+        for h, m, s in zip(hours, minutes, secs)
+    ]
+
+
+def format_subtitle_timestamps(seconds, separator):
+    """Convert a sequence of seconds to HH:MM:SS<separator>mmm strings.
+
+    Use separator="," for SRT and "." for WebVTT.
+    """
+    millis = np.rint(np.asarray(seconds, dtype=np.float64) * 1000).astype(np.int64)
+    hours = (millis // 3_600_000).tolist()
+    minutes = ((millis % 3_600_000) // 60_000).tolist()
+    secs = ((millis % 60_000) // 1000).tolist()
+    ms = (millis % 1000).tolist()
+    return [
+        f"{h:02d}:{m:02d}:{s:02d}{separator}{x:03d}"
+        for h, m, s, x in zip(hours, minutes, secs, ms)
+    ]
+
+
+def cuda_stream(device):
+    """Return a context that runs CUDA work on a fresh stream, or a no-op.
+
+    The stream waits on the current stream first, so work already queued
+    there (the audio upload) is finished before the new stream reads it.
+    """
+    torch = load_torch()
+
+    if device == "cuda":
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        return torch.cuda.stream(stream)
+    return contextlib.nullcontext()
+
+
+def diarize_on_stream(hf_token, device, audio_tensor):
+    """Load and run diarization on its own CUDA stream (worker thread)."""
+    torch = load_torch()
+
+    stream = torch.cuda.Stream()
+    # The audio was copied to the device on the default stream
+    stream.wait_stream(torch.cuda.default_stream())
+    with torch.cuda.stream(stream):
+        diarize_model = load_diarize_model(hf_token, device)
+        diarize_segments = diarize(diarize_model, audio_tensor.unsqueeze(0))
+    stream.synchronize()
+    return diarize_segments
+
+
+def _write_file(output_path, parts):
+    """Write byte chunks to a file atomically via a temp file and os.replace.
+
+    The parts are UTF-8 bytes, io.BytesIO buffers (written via getbuffer) or
+    spooled temp files (copied in 1 MB blocks and closed), so the text is
+    never re-joined or re-encoded.
+    """
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    try:
+        with open(tmp_path, "wb", buffering=1 << 20) as f:
+            for part in parts:
+                if isinstance(part, io.BytesIO):
+                    f.write(part.getbuffer())
+                elif hasattr(part, "read"):
+                    part.seek(0)
+                    shutil.copyfileobj(part, f, 1 << 20)
+                    part.close()
+                else:
+                    f.write(part)
+        os.replace(tmp_path, output_path)
+        print(f"Saved: {output_path}")
+    except Exception as e:
+        print(f"Could not save {output_path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        raise OSError(f"Could not save {output_path.name}: {e}") from e
+
+
+def save_in_background(output_path, parts):
+    """Queue a _write_file call on the writer thread."""
+    _pending_saves.append(_WRITER.submit(_write_file, output_path, parts))
+
+
+def check_saves(wait=False):
+    """Return error messages for background saves that failed.
+
+    Finished saves are dropped from the pending list; with wait=True this
+    blocks until every queued save has finished.
+    """
+    errors = []
+    for future in list(_pending_saves):
+        if wait or future.done():
+            _pending_saves.remove(future)
+            if future.exception() is not None:
+                errors.append(str(future.exception()))
+    return errors
 
 
 def transcribe(
     audio_file,
     language,
     model_size,
+    compute_type,
+    use_silero_vad,
+    word_timestamps,
     enable_diarization,
     hf_token,
     progress=gr.Progress(),
 ):
-    """Main transcription function."""
+    """Main transcription function.
+
+    A generator: yields (transcript, status) pairs so Gradio can show partial
+    transcripts while long files are being formatted.
+    """
     if audio_file is None:
-        return "Please upload an audio file.", ""
+        yield "Please upload an audio file.", ""
+        return
 
     # Validate file extension
     audio_path = Path(audio_file)
     if audio_path.suffix.lower() not in AUDIO_FORMATS:
-        return f"Unsupported file format. Supported formats: {', '.join(AUDIO_FORMATS)}", ""
+        yield f"Unsupported file format. Supported formats: {', '.join(AUDIO_FORMATS)}", ""
+        return
+
+    import whisperx
+    torch = load_torch()
 
     device = get_device()
-    compute_type = get_compute_type(device)
+    torch_device = get_torch_device()
+    if compute_type in (None, "", "auto"):
+        compute_type = get_compute_type(device)
 
     print(f"\n{'='*60}")
     print(f"AudioScribe Transcription")
     print(f"{'='*60}")
     print(f"File: {audio_path.name}")
-    print(f"Device: {device}")
+    print(f"Device: {device} (alignment/speakers: {torch_device})")
     print(f"Model: {model_size}")
+    print(f"Compute type: {compute_type}")
+    print(f"Voice detection: {'Silero' if use_silero_vad else 'pyannote'}")
+    print(f"Word-level alignment: {'Enabled' if word_timestamps else 'Disabled'}")
     print(f"Language: {language}")
     print(f"Speaker identification: {'Enabled' if enable_diarization else 'Disabled'}")
     print(f"{'='*60}\n")
@@ -132,49 +583,59 @@ def transcribe(
         print("Loading Whisper model...")
 
         lang_code = LANGUAGES.get(language)
-        model = whisperx.load_model(
-            model_size,
-            device,
-            compute_type=compute_type,
-            language=lang_code,
+        model = load_whisper_model(
+            model_size, device, compute_type, lang_code,
+            vad_method="silero" if use_silero_vad else "pyannote",
         )
 
         # Load audio
         progress(0.2, desc="Loading audio...")
         print("Loading audio file...")
-        audio = whisperx.load_audio(str(audio_path))
+        audio, audio_tensor = load_audio(str(audio_path), torch_device)
 
         # Transcribe
         progress(0.3, desc="Transcribing...")
         print("Transcribing audio (this may take a while)...")
-        result = model.transcribe(audio, batch_size=16)
+        batch_size = _pick_batch_size(device, model_size)
+        print(f"Batch size: {batch_size}")
+        result = transcribe_with_retry(model, audio, batch_size, device)
         detected_language = result.get("language", lang_code or "en")
         print(f"Detected language: {detected_language}")
 
-        # Align whisper output
-        progress(0.6, desc="Aligning transcription...")
-        print("Aligning transcription...")
-        model_a, metadata = whisperx.load_align_model(
-            language_code=detected_language, device=device
-        )
-        result = whisperx.align(
-            result["segments"],
-            model_a,
-            metadata,
-            audio,
-            device,
-            return_char_alignments=False,
-        )
+        # Alignment and diarization both only need the audio, so on CUDA the
+        # diarization starts now on its own stream and overlaps the alignment.
+        run_diarization = enable_diarization and hf_token
+        diarize_future = None
+        if run_diarization and device == "cuda":
+            print("Running speaker identification in parallel...")
+            diarize_future = _DIARIZER.submit(
+                diarize_on_stream, hf_token, device, audio_tensor
+            )
+
+        # Align whisper output. WhisperX transcribes without timestamp
+        # tokens, so until alignment splits them each segment is a whole
+        # VAD chunk of up to 30 s. Speaker assignment needs the finer
+        # segments, so diarization always aligns.
+        if word_timestamps or run_diarization:
+            progress(0.6, desc="Aligning transcription...")
+            print("Aligning transcription...")
+            model_a, metadata = load_align_model(detected_language, torch_device)
+            with cuda_stream(torch_device):
+                result = align(
+                    result["segments"], model_a, metadata, audio_tensor, torch_device
+                )
 
         # Speaker diarization (optional)
-        if enable_diarization and hf_token:
+        if run_diarization:
             progress(0.7, desc="Identifying speakers...")
-            print("Running speaker identification...")
             try:
-                diarize_model = whisperx.DiarizationPipeline(
-                    hf_token=hf_token, device=device
-                )
-                diarize_segments = diarize_model(audio)
+                if diarize_future is not None:
+                    diarize_segments = diarize_future.result()
+                    torch.cuda.synchronize()
+                else:
+                    print("Running speaker identification...")
+                    diarize_model = load_diarize_model(hf_token, torch_device)
+                    diarize_segments = diarize(diarize_model, audio_tensor.unsqueeze(0))
                 result = whisperx.assign_word_speakers(diarize_segments, result)
                 print("Speaker identification complete!")
             except Exception as e:
@@ -185,54 +646,105 @@ def transcribe(
         progress(0.9, desc="Formatting output...")
         print("Formatting transcript...")
 
-        transcript_lines = []
-        full_text_lines = []
-
-        for segment in result["segments"]:
-            start_time = format_timestamp(segment["start"])
-            end_time = format_timestamp(segment["end"])
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_filename = f"{audio_path.stem}_transcript_{timestamp}.txt"
+        output_path = DOWNLOADS_DIR / output_filename
+        DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
+
+        segments = result["segments"]
+        starts = [seg["start"] for seg in segments]
+        ends = [seg["end"] for seg in segments]
+        start_times = format_timestamps(starts)
+        end_times = format_timestamps(ends)
+        srt_starts = format_subtitle_timestamps(starts, ",")
+        srt_ends = format_subtitle_timestamps(ends, ",")
+        vtt_starts = format_subtitle_timestamps(starts, ".")
+        vtt_ends = format_subtitle_timestamps(ends, ".")
+
+        # Build the .txt, .srt and .vtt outputs in the same pass, encoding
+        # each line once into the file buffers. Only the timestamped
+        # transcript (also shown in the UI) stays in memory; the disk-only
+        # outputs go to temp files that spill to disk past 1 MB. The last
+        # 200 lines are kept as strings to stream to the UI every 50 segments.
+        transcript_buf = io.BytesIO()
+        full_text_buf = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        srt_buf = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        vtt_buf = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        vtt_buf.write(b"WEBVTT\n\n")
+        recent_lines = deque(maxlen=200)
+        cue = 0  # SRT cues must be numbered without gaps
+
+        segment_times = zip(
+            segments, start_times, end_times, srt_starts, srt_ends, vtt_starts, vtt_ends
+        )
+        for count, (
+            segment, start_time, end_time, srt_start, srt_end, vtt_start, vtt_end
+        ) in enumerate(segment_times, 1):
             text = segment["text"].strip()
 
             # Check for speaker label
             speaker = segment.get("speaker", "")
             if speaker:
                 line = f"[{start_time} - {end_time}] [{speaker}]: {text}"
+                srt_text = f"{speaker}: {text}"
+                vtt_text = f"<v {speaker}>{text}"
             else:
                 line = f"[{start_time} - {end_time}]: {text}"
-
-            transcript_lines.append(line)
-            full_text_lines.append(text)
-
-        transcript = "\n".join(transcript_lines)
-        full_text = " ".join(full_text_lines)
-
-        # Save to file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_filename = f"{audio_path.stem}_transcript_{timestamp}.txt"
-        output_path = DOWNLOADS_DIR / output_filename
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(f"AudioScribe Transcript\n")
-            f.write(f"File: {audio_path.name}\n")
-            f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Model: {model_size}\n")
-            f.write(f"Language: {detected_language}\n")
-            f.write(f"{'='*60}\n\n")
-            f.write(transcript)
-            f.write(f"\n\n{'='*60}\n")
-            f.write("Full Text:\n\n")
-            f.write(full_text)
+                srt_text = vtt_text = text
+
+            transcript_buf.write(line.encode("utf-8"))
+            transcript_buf.write(b"\n")
+            full_text_buf.write(text.encode("utf-8"))
+            full_text_buf.write(b" ")
+            # A cue with no text line breaks strict subtitle parsers
+            if text:
+                cue += 1
+                srt_buf.write(
+                    f"{cue}\n{srt_start} --> {srt_end}\n{srt_text}\n\n".encode("utf-8")
+                )
+                vtt_buf.write(
+                    f"{vtt_start} --> {vtt_end}\n{vtt_text}\n\n".encode("utf-8")
+                )
+            recent_lines.append(line)
+
+            if count % 50 == 0:
+                yield "\n".join(recent_lines), ""
+
+        # Drop the trailing separator after the last segment
+        full_text_buf.truncate(max(full_text_buf.tell() - 1, 0))
+        transcript = transcript_buf.getvalue().decode("utf-8").rstrip("\n")
+
+        # Save to file in the background
+        header = (
+            f"AudioScribe Transcript\n"
+            f"File: {audio_path.name}\n"
+            f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"Model: {model_size}\n"
+            f"Language: {detected_language}\n"
+            f"{'='*60}\n\n"
+        )
+        footer = f"\n{'='*60}\nFull Text:\n\n"
+        save_in_background(
+            output_path,
+            [header.encode("utf-8"), transcript_buf, footer.encode("utf-8"), full_text_buf],
+        )
+        save_in_background(output_path.with_suffix(".srt"), [srt_buf])
+        save_in_background(output_path.with_suffix(".vtt"), [vtt_buf])
 
         progress(1.0, desc="Complete!")
-        print(f"\nTranscript saved to: {output_path}")
         print("Transcription complete!")
 
-        return transcript, f"Saved to: {output_path}"
+        # The files are still being written; report any earlier save that
+        # failed since the last check
+        status = f"Saving to: {output_path} (+ .srt and .vtt subtitles)"
+        for error in check_saves():
+            status += f"\n{_SAVE_FAILED}{error}"
+        yield transcript, status
 
     except Exception as e:
         error_msg = f"Error during transcription: {str(e)}"
         print(error_msg)
-        return error_msg, ""
+        yield error_msg, ""
 
 
 # ---------------------------------------------------------------------------
@@ -254,7 +766,8 @@ class _BatchProgress:
         return args[0] if args else iter([])
 
 
-def transcribe_batch(files, language, model_size, enable_diarization, hf_token,
+def transcribe_batch(files, language, model_size, compute_type, use_silero_vad,
+                     word_timestamps, enable_diarization, hf_token,
                      progress=gr.Progress()):
     """Transcribe multiple audio files in sequence (batch mode)."""
     if not files:
@@ -272,7 +785,7 @@ def transcribe_batch(files, language, model_size, enable_diarization, hf_token,
 
     total = len(paths)
     results = []
-    saved = []
+    save_errors = []
     success_count = 0
 
     print(f"\n{'='*60}")
@@ -284,22 +797,36 @@ def transcribe_batch(files, language, model_size, enable_diarization, hf_token,
         sub = _BatchProgress(progress, idx / total, 1.0 / total)
 
         try:
-            transcript, status = transcribe(fp, language, model_size,
-                                            enable_diarization, hf_token, sub)
+            transcript, status = "", ""
+            for transcript, status in transcribe(fp, language, model_size,
+                                                 compute_type, use_silero_vad,
+                                                 word_timestamps,
+                                                 enable_diarization, hf_token, sub):
+                pass
             results.append(f"{'='*60}\n{name}\n{'='*60}\n\n{transcript}")
-            if status:
-                saved.append(status)
+            # Saves that failed while this file ran are reported in its status
+            save_errors.extend(
+                line[len(_SAVE_FAILED):] for line in status.splitlines()
+                if line.startswith(_SAVE_FAILED)
+            )
             if not transcript.startswith("Error") and "Unsupported" not in transcript:
                 success_count += 1
         except Exception as e:
             results.append(f"{'='*60}\n{name}\n{'='*60}\n\nERROR: {e}")
 
+    # Wait for the background writes so the summary is accurate
+    save_errors += check_saves(wait=True)
     progress(1.0, desc=f"Done! {success_count}/{total} files processed.")
+    if save_errors:
+        saved_line = f"{len(save_errors)} file(s) could not be saved to ~/Downloads/"
+        save_summary = saved_line + ":\n" + "\n".join(save_errors)
+    else:
+        saved_line = "All transcripts saved to ~/Downloads/"
+        save_summary = f"{success_count} transcript(s) saved to ~/Downloads/"
     header = (
         f"BATCH COMPLETE: {success_count}/{total} files transcribed.\n"
-        f"All transcripts saved to ~/Downloads/\n\n"
+        f"{saved_line}\n\n"
     )
-    save_summary = f"{success_count} transcript(s) saved to ~/Downloads/"
     return header + "\n\n".join(results), save_summary
 
 
@@ -362,6 +889,26 @@ def create_interface():
                     info="Start with 'tiny' - it's fast and works on any computer",
                 )
 
+                compute_type = gr.Dropdown(
+                    choices=COMPUTE_TYPES,
+                    value="auto",
+                    label="Compute Type",
+                    info="'auto' picks int8 on CPU; 'float32' is full precision; float16 types need CUDA",
+                )
+
+                use_silero_vad = gr.Checkbox(
+                    label="Fast voice detection (Silero VAD)",
+                    value=True,
+                    info="Skips silence quickly; turn off to use the pyannote VAD",
+                )
+
+                word_timestamps = gr.Checkbox(
+                    label="Sentence and word timestamps",
+                    value=True,
+                    info="Splits the transcript into sentences; off gives ~30 s blocks "
+                         "(always on with speaker identification)",
+                )
+
                 with gr.Accordion("Speaker Identification", open=has_token):
                     gr.Markdown(
                         """
@@ -417,6 +964,9 @@ def create_interface():
                 audio_input,
                 language,
                 model_size,
+                compute_type,
+                use_silero_vad,
+                word_timestamps,
                 enable_diarization,
                 hf_token,
             ],
@@ -428,6 +978,9 @@ def create_interface():
                 file_input,
                 language,
                 model_size,
+                compute_type,
+                use_silero_vad,
+                word_timestamps,
                 enable_diarization,
                 hf_token,
             ],
@@ -455,7 +1008,6 @@ if __name__ == "__main__":
     print("\n" + "="*60)
     print("AudioScribe - Local Audio Transcription")
     print("="*60)
-    print(f"Device: {get_device()}")
     print("Starting web interface...")
     print("="*60 + "\n")
 
@@ -12,24 +12,47 @@ Usage:
 Then open http://127.0.0.1:7860 in your browser.
 """
 
+import os
 import shutil
 import pathlib
-import datetime
+import functools
+import importlib.util
+import hashlib
+import time
 import warnings
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 APP_VERSION = "2.1.0"  # bump when UI changes — confirms correct code is running
 
 warnings.filterwarnings("ignore")
 
+# ---------------------------------------------------------------------------
+# CPU threading — one thread per physical core.  Left unset, OpenMP/MKL and
+# CTranslate2 spawn a thread per logical core and thrash hyperthreads on
+# the int8 CPU path.  Must be set before torch is imported.  psutil is
+# optional; without it assume two logical cores per physical core.
+# ---------------------------------------------------------------------------
+try:
+    import psutil
+    _PHYSICAL_CORES = psutil.cpu_count(logical=False) or 4
+except ImportError:
+    _PHYSICAL_CORES = max(1, (os.cpu_count() or 8) // 2)
+
+os.environ.setdefault("OMP_NUM_THREADS", str(_PHYSICAL_CORES))
+os.environ.setdefault("MKL_NUM_THREADS", str(_PHYSICAL_CORES))
+
 # ---------------------------------------------------------------------------
 # PyTorch 2.6+ changed torch.load to default weights_only=True which breaks
 # loading pyannote VAD models used by WhisperX.  Patch it back to the old
-# behaviour since all models are from trusted sources.
+# behaviour since all models are from trusted sources.  Older torch
+# (including the pinned 2.5.1) is left alone so checkpoint loading goes
+# through the stock loader.  The patch is applied once per process (a
+# sentinel attribute guards against double-wrapping on re-import).
 # ---------------------------------------------------------------------------
 import torch
-import torch.serialization
 import torchaudio
 
 # ---------------------------------------------------------------------------
@@ -53,20 +76,25 @@ if not hasattr(torchaudio, "AudioMetaData"):
 if not hasattr(torchaudio, "list_audio_backends"):
     torchaudio.list_audio_backends = lambda: ["ffmpeg"]
 
-_original_torch_load = (
-    torch.serialization.load.__wrapped__
-    if hasattr(torch.serialization.load, "__wrapped__")
-    else torch.serialization.load
+_TORCH_VERSION = tuple(
+    int(part) for part in torch.__version__.split("+")[0].split(".")[:2]
 )
 
+if _TORCH_VERSION >= (2, 6) and not getattr(torch.load, "_audioscribe_patched", False):
+    _original_torch_load = torch.load
 
-def _patched_torch_load(*args, **kwargs):
-    kwargs["weights_only"] = False
-    return _original_torch_load(*args, **kwargs)
+    def _patched_torch_load(*args, **kwargs):
+        # Lightning passes weights_only=None through, which torch 2.6
+        # treats as True — so override None as well as a missing value
+        if kwargs.get("weights_only") is None:
+            kwargs["weights_only"] = False
+        return _original_torch_load(*args, **kwargs)
 
+    _patched_torch_load._audioscribe_patched = True
+    torch.load = _patched_torch_load
 
-torch.load = _patched_torch_load
-torch.serialization.load = _patched_torch_load
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.set_num_threads(_PHYSICAL_CORES)
 
 import gradio as gr
 
@@ -76,17 +104,12 @@ import gradio as gr
 HOME = pathlib.Path.home()
 DOWNLOADS = HOME / "Downloads"
 TOKEN_FILE = HOME / ".audioscribe_token.txt"
+# Set once DOWNLOADS has been created, so later runs skip the mkdir
+_DOWNLOADS_READY = False
 
 # ---------------------------------------------------------------------------
 # Supported languages (WhisperX language codes)
 # ---------------------------------------------------------------------------
-LANGUAGES = [
-    "English", "Spanish", "French", "German", "Italian", "Portuguese",
-    "Dutch", "Russian", "Chinese", "Japanese", "Korean", "Arabic",
-    "Hindi", "Turkish", "Polish", "Swedish", "Danish", "Norwegian",
-    "Finnish", "Greek", "Czech",
-]
-
 LANG_CODES = {
     "English": "en", "Spanish": "es", "French": "fr", "German": "de",
     "Italian": "it", "Portuguese": "pt", "Dutch": "nl", "Russian": "ru",
@@ -96,32 +119,60 @@ LANG_CODES = {
     "Czech": "cs",
 }
 
+# Dropdown (label, value) pairs — the callback receives the code directly.
+# "" stands for Auto-detect since Gradio can't round-trip a None value.
+LANG_CHOICES = [("Auto-detect", "")] + list(LANG_CODES.items())
+
 MODELS = ["tiny", "base", "small", "medium", "large-v2", "large-v3"]
 
+# CTranslate2 compute types offered in the UI — "auto" picks per device
+COMPUTE_TYPES = ["auto", "float16", "int8_float16", "bfloat16", "int8"]
+
 AUDIO_EXTENSIONS = [
     ".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg", ".wma", ".webm", ".mp4",
 ]
 
+# Whisper batch sizes on a 16 GB CUDA GPU, scaled by available VRAM
+_CUDA_BATCH_SIZES = {"tiny": 64, "base": 48, "small": 32, "medium": 16, "large": 8}
+
+# Segments written between streamed transcript updates in the UI
+_STREAM_EVERY = 25
+
 # ---------------------------------------------------------------------------
 # Model cache — avoids reloading the same model between transcriptions
 # ---------------------------------------------------------------------------
-_model_cache = {"key": None, "model": None}
+_model_cache = {"key": None, "asr": None, "backend": None}
+_model_lock = threading.Lock()
+# Alignment model keyed by (language, device); diarization pipeline keyed by
+# (device, token hash).  Same evict-on-key-mismatch scheme as _model_cache.
+_align_cache = {"key": None, "model": None, "metadata": None}
+_diar_cache = {"key": None, "pipeline": None}
+
+# Auto-detected language keyed by audio fingerprint, so re-running a file
+# skips Whisper's language-ID pass
+_lang_cache: dict[str, str] = {}
+
+# Saved Hugging Face token — read from disk once, refreshed by save_token()
+_token_cache: str | None = None
 
 # ---------------------------------------------------------------------------
 # Token helpers
 # ---------------------------------------------------------------------------
 
 def load_token() -> str:
-    if TOKEN_FILE.exists():
-        return TOKEN_FILE.read_text().strip()
-    return ""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TOKEN_FILE.read_text().strip() if TOKEN_FILE.exists() else ""
+    return _token_cache
 
 
 def save_token(token: str) -> str:
+    global _token_cache
     token = token.strip()
     if not token:
         return "No token provided."
     TOKEN_FILE.write_text(token)
+    _token_cache = token
     return f"Token saved to {TOKEN_FILE}"
 
 
@@ -135,18 +186,249 @@ def get_device() -> str:
     return "cpu"
 
 
-def get_compute_type(device: str) -> str:
-    return "float16" if device == "cuda" else "int8"
+def get_compute_type(device: str, requested: str = "auto") -> str:
+    """Resolve the CTranslate2 compute type.
+
+    On CUDA, "auto" means int8 weights with fp16 activations on Volta and
+    newer (compute capability 7.0+), which halves the weight bandwidth, and
+    plain fp16 on older cards.  The CPU always uses int8.
+    """
+    if device != "cuda":
+        return "int8"
+    if requested != "auto":
+        return requested
+    if torch.cuda.get_device_capability()[0] >= 7:
+        return "int8_float16"
+    return "float16"
+
+
+# ---------------------------------------------------------------------------
+# Batch sizes — sized to the device so large GPUs are kept busy and small
+# ones don't run out of memory
+# ---------------------------------------------------------------------------
+
+def _pick_batch_size(device: str, model_size: str) -> int:
+    family = model_size.split("-")[0]
+    base = _CUDA_BATCH_SIZES.get(family, 8)
+    if device == "cuda":
+        total_gb = torch.cuda.get_device_properties(0).total_memory / 1024**3
+        return max(1, int(base * min(total_gb / 16, 2.0)))
+    # CPU: the batch size used before GPU sizing was added
+    return 4
+
+
+def _pick_diarize_batch_size(device: str) -> int:
+    return 32 if device == "cuda" else 1
+
+
+@torch.inference_mode()
+def _run_diarization(pipeline, audio_input, device: str):
+    """Run the pyannote pipeline under fp16 autocast on CUDA, with autograd
+    tracking off.
+
+    The embedding network dominates diarization time on long files and runs
+    about twice as fast in half precision.  Falls back to fp32 if a layer
+    refuses fp16.
+    """
+    if device != "cuda":
+        return pipeline(audio_input)
+    try:
+        with torch.autocast("cuda", dtype=torch.float16):
+            return pipeline(audio_input)
+    except Exception as exc:
+        print(f"       fp16 diarization failed ({exc}) — retrying in fp32", flush=True)
+        return pipeline(audio_input)
+
+
+def _transcribe_with_retry(batched, audio, lang_code, batch_size: int, device: str):
+    """Transcribe with the batched pipeline, halving the batch size on
+    out-of-memory errors.
+
+    Returns a WhisperX-style ``{"segments": [...], "language": ...}`` dict
+    so alignment and diarization can consume it unchanged.
+    """
+    while True:
+        try:
+            segments, info = batched.transcribe(
+                audio, language=lang_code, batch_size=batch_size, vad_filter=True,
+            )
+            # segments is a lazy generator — decoding happens here
+            return {
+                "segments": [
+                    {"start": seg.start, "end": seg.end, "text": seg.text,
+                     "avg_logprob": seg.avg_logprob}
+                    for seg in segments
+                ],
+                "language": info.language,
+            }
+        except RuntimeError as e:
+            if "out of memory" not in str(e).lower() or batch_size == 1:
+                raise
+            batch_size //= 2
+            print(f"       Out of memory — retrying with batch size {batch_size}", flush=True)
+            if device == "cuda":
+                torch.cuda.empty_cache()
+
+
+def _audio_fingerprint(audio) -> str:
+    """Short fingerprint of a decoded file: sample count plus a hash of the
+    first two seconds."""
+    digest = hashlib.sha1(audio[:32000].tobytes()).hexdigest()[:8]
+    return f"{len(audio)}:{digest}"
+
+
+class _GPUFeatureExtractor:
+    """Drop-in replacement for faster-whisper's FeatureExtractor that
+    computes the log-mel spectrogram on the GPU.
+
+    The stock extractor runs the STFT and mel projection in NumPy on the
+    CPU for every VAD chunk.  Here the Hann window and mel filterbank live
+    on the GPU and the maths is the same, so features are identical to
+    within float rounding.  Everything else is delegated to the wrapped
+    extractor.
+    """
+
+    def __init__(self, base, device: str = "cuda"):
+        self._base = base
+        self._device = device
+        self._window = torch.hann_window(base.n_fft, device=device)
+        self._mel_filters = torch.from_numpy(base.mel_filters).to(device)
+
+    def __getattr__(self, name):
+        return getattr(self._base, name)
+
+    def __call__(self, waveform, padding=160, chunk_length=None):
+        base = self._base
+        if chunk_length is not None:
+            base.n_samples = chunk_length * base.sampling_rate
+            base.nb_max_frames = base.n_samples // base.hop_length
+
+        audio = torch.as_tensor(waveform, dtype=torch.float32).to(
+            self._device, non_blocking=True,
+        )
+        if padding:
+            audio = torch.nn.functional.pad(audio, (0, padding))
+
+        stft = torch.stft(
+            audio, base.n_fft, base.hop_length,
+            window=self._window, return_complex=True,
+        )
+        magnitudes = stft[..., :-1].abs() ** 2
+        mel_spec = self._mel_filters @ magnitudes
+
+        log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+        log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+        log_spec = (log_spec + 4.0) / 4.0
+        # CTranslate2 takes the features as a NumPy array
+        return log_spec.cpu().numpy()
+
+
+# ---------------------------------------------------------------------------
+# Audio decoding
+# ---------------------------------------------------------------------------
+
+SAMPLE_RATE = 16000
+# Longest file decoded straight into pinned memory (2 hours, ~460 MB fp32)
+_MAX_PINNED_SAMPLES = 2 * 60 * 60 * SAMPLE_RATE
+
+
+def _probe_duration(path: str) -> float | None:
+    """Return the duration of a media file in seconds, or None if ffprobe
+    can't tell."""
+    try:
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", path],
+            capture_output=True, text=True, timeout=30,
+        )
+        return float(out.stdout.strip())
+    except Exception:
+        return None
+
+
+def _load_audio_gpu(path: str, device: str):
+    """Decode audio to 16 kHz mono float32.
+
+    Returns ``(audio, waveform)``: a NumPy array for faster-whisper and the
+    same samples as a torch tensor on ``device`` for alignment and
+    diarization.  On CUDA, ffmpeg's f32le output is read straight into a
+    pinned buffer sized from ffprobe and copied to the GPU asynchronously.
+    Falls back to whisperx.load_audio for CPU, unknown durations, or files
+    over two hours.
+    """
+    import whisperx
+
+    duration = _probe_duration(path) if device == "cuda" else None
+    if duration is not None:
+        # One second of headroom for container durations that round down
+        max_samples = int(duration * SAMPLE_RATE) + SAMPLE_RATE
+        if max_samples <= _MAX_PINNED_SAMPLES:
+            buf = torch.empty(max_samples, dtype=torch.float32, pin_memory=True)
+            view = memoryview(buf.numpy()).cast("B")
+            proc = subprocess.Popen(
+                ["ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+                 "-f", "f32le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+            filled = 0
+            while filled < len(view):
+                n = proc.stdout.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            overflow = bool(proc.stdout.read(1))
+            proc.stdout.close()
+            proc.wait()
+            if proc.returncode == 0 and not overflow:
+                buf = buf[: filled // 4]
+                return buf.numpy(), buf.to(device, non_blocking=True)
+
+    audio = whisperx.load_audio(path)
+    return audio, torch.from_numpy(audio).to(device)
+
+
+# Batch mode decodes the next file on this thread while the current one is
+# being transcribed
+_DECODER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audioscribe-decode")
+_prefetched = {}
+
+
+def _prefetch_audio(path: str, device: str):
+    """Start decoding ``path`` in the background."""
+    if path not in _prefetched:
+        _prefetched[path] = _DECODER.submit(_load_audio_gpu, path, device)
+
+
+def _get_audio(path: str, device: str):
+    """Return the decoded audio for ``path``, using a prefetched decode if
+    there is one."""
+    future = _prefetched.pop(path, None)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception:
+            pass  # decode again below so the error surfaces here
+    return _load_audio_gpu(path, device)
 
 
 # ---------------------------------------------------------------------------
 # FFmpeg check
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=1)
 def check_ffmpeg() -> bool:
+    # Cached — scanning PATH is slow on Windows.  recheck_ffmpeg() clears it.
     return shutil.which("ffmpeg") is not None
 
 
+def recheck_ffmpeg() -> str:
+    """Forget the cached FFmpeg lookup (e.g. after installing it mid-session)."""
+    check_ffmpeg.cache_clear()
+    if check_ffmpeg():
+        return "FFmpeg found."
+    return "FFmpeg not found — install with: winget install FFmpeg"
+
+
 # ---------------------------------------------------------------------------
 # pyannote.audio compatibility — some version combinations pass `token=` to
 # Inference.__init__() which doesn't accept it.  Applied lazily so that all
@@ -279,64 +561,192 @@ def _patch_pyannote():
 # Model loading with cache
 # ---------------------------------------------------------------------------
 
+def _get_backend(device: str, model_size: str, lang_code) -> str:
+    """Pick the speech-recognition backend.
+
+    On CUDA, use TensorRT-LLM (through WhisperS2T) when it is installed —
+    its fused FP16 kernels decode noticeably faster than CTranslate2.
+    WhisperS2T needs an explicit language, so Auto-detect stays on
+    faster-whisper/CTranslate2.
+    """
+    if device != "cuda" or lang_code is None or model_size not in MODELS:
+        return "ctranslate2"
+    if importlib.util.find_spec("whisper_s2t") is None:
+        return "ctranslate2"
+    return "trtllm"
+
+
 def _get_model(model_size, device, compute_type, lang_code):
-    """Load a WhisperX model, reusing the cached one if settings match."""
-    import whisperx
+    """Load the speech-recognition model, reusing the cached one if settings
+    match.  Returns ``(asr, backend)``.
+
+    For the CTranslate2 backend, ``asr`` is faster-whisper's
+    BatchedInferencePipeline around a WhisperModel, which splits a file into
+    Silero VAD chunks and decodes them in parallel batches on the GPU.  The
+    model is built directly rather than through whisperx.load_model, which
+    would also load a pyannote VAD and pipeline wrapper that go unused.
+    For TensorRT-LLM it is a WhisperS2T model (the engine is built by
+    WhisperS2T on first load and cached).
+    """
+    from faster_whisper import BatchedInferencePipeline, WhisperModel
 
     global _model_cache
-    key = (model_size, device, compute_type, lang_code)
-
-    if _model_cache["key"] == key and _model_cache["model"] is not None:
-        print("       Using cached model", flush=True)
-        return _model_cache["model"]
 
-    # Free previous model
-    if _model_cache["model"] is not None:
-        del _model_cache["model"]
-        _model_cache = {"key": None, "model": None}
+    # Held for the whole lookup/load so the startup warm-up thread and the
+    # first request can't load the same model twice
+    with _model_lock:
+        backend = _get_backend(device, model_size, lang_code)
+        # The language is passed per call, so it isn't part of the key
+        key = (backend, model_size, device, compute_type)
+
+        if _model_cache["key"] == key and _model_cache["asr"] is not None:
+            print("       Using cached model", flush=True)
+            return _model_cache["asr"], _model_cache["backend"]
+
+        # Free previous model
+        if _model_cache["asr"] is not None:
+            del _model_cache["asr"]
+            _model_cache = {"key": None, "asr": None, "backend": None}
+
+        if backend == "trtllm":
+            try:
+                import whisper_s2t
+                asr = whisper_s2t.load_model(
+                    model_identifier=model_size,
+                    backend="TensorRT-LLM",
+                    compute_type="float16",
+                )
+                _model_cache = {"key": key, "asr": asr, "backend": backend}
+                print("       Using TensorRT-LLM backend", flush=True)
+                return asr, backend
+            except Exception as exc:
+                print(f"       TensorRT-LLM backend unavailable ({exc}) — using CTranslate2", flush=True)
+                backend = "ctranslate2"
+
+        model = WhisperModel(
+            model_size, device, compute_type=compute_type,
+            cpu_threads=_PHYSICAL_CORES,
+        )
         if device == "cuda":
-            torch.cuda.empty_cache()
+            model.feature_extractor = _GPUFeatureExtractor(
+                model.feature_extractor, device,
+            )
+        asr = BatchedInferencePipeline(model=model)
+        _model_cache = {"key": key, "asr": asr, "backend": backend}
+        return asr, backend
 
-    model = whisperx.load_model(
-        model_size, device, compute_type=compute_type, language=lang_code,
+
+def _warm_up_model():
+    """Load the default model and run it once on silence.
+
+    Started on a background thread from main() so the first transcription
+    doesn't pay the model load, and so CTranslate2 has already picked its
+    kernels by the time a real request arrives.
+    """
+    import numpy as np
+
+    try:
+        device = get_device()
+        model, backend = _get_model("tiny", device, get_compute_type(device), "en")
+        if backend == "ctranslate2":
+            segments, _ = model.transcribe(
+                np.zeros(SAMPLE_RATE * 2, dtype=np.float32),
+                language="en", batch_size=1, vad_filter=False,
+            )
+            list(segments)
+        print("  Model warm-up complete", flush=True)
+    except Exception as exc:
+        print(f"  Model warm-up skipped: {exc}", flush=True)
+
+
+def _get_align(language_code: str, device: str):
+    """Load the wav2vec2 alignment model, reusing the cached one if the
+    language and device match.  Returns ``(model, metadata)``."""
+    import whisperx
+
+    global _align_cache
+    key = (language_code, device)
+
+    if _align_cache["key"] == key and _align_cache["model"] is not None:
+        return _align_cache["model"], _align_cache["metadata"]
+
+    _align_cache = {"key": None, "model": None, "metadata": None}
+    model, metadata = whisperx.load_align_model(
+        language_code=language_code, device=device,
+    )
+    _align_cache = {"key": key, "model": model, "metadata": metadata}
+    return model, metadata
+
+
+def _get_diarizer(device: str, token: str):
+    """Load the pyannote diarization pipeline, reusing the cached one if the
+    device and Hugging Face token match."""
+    from pyannote.audio import Pipeline as PyannotePipeline
+
+    global _diar_cache
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    key = (device, token_hash)
+
+    if _diar_cache["key"] == key and _diar_cache["pipeline"] is not None:
+        print("       Using cached diarization pipeline", flush=True)
+        return _diar_cache["pipeline"]
+
+    _diar_cache = {"key": None, "pipeline": None}
+    # Use pyannote directly — avoids whisperx wrapper
+    # token kwarg mismatch issues.
+    diar_model_name = (
+        "pyannote/speaker-diarization-3.1"
+        if _pyannote_version() < 4
+        else "pyannote/speaker-diarization-community-1"
     )
-    _model_cache = {"key": key, "model": model}
-    return model
+    token_kw = _pyannote_token_kwarg(token)
+    pipeline = PyannotePipeline.from_pretrained(
+        diar_model_name, **token_kw,
+    ).to(torch.device(device))
+    diar_batch_size = _pick_diarize_batch_size(device)
+    pipeline.segmentation_batch_size = diar_batch_size
+    pipeline.embedding_batch_size = diar_batch_size
+    _diar_cache = {"key": key, "pipeline": pipeline}
+    return pipeline
 
 
 # ---------------------------------------------------------------------------
 # Transcription
 # ---------------------------------------------------------------------------
 
-def transcribe(audio_path, language, model_size, enable_diarization, hf_token,
-               progress=gr.Progress()):
-    """Transcribe an audio file and return the text."""
+def transcribe(audio_path, lang_code, model_size, enable_diarization, hf_token,
+               compute_type="auto", progress=gr.Progress()):
+    """Transcribe an audio file, yielding the transcript as it is built.
+
+    The last value yielded is the complete transcript (or an error message).
+    """
+    global _DOWNLOADS_READY
     if audio_path is None:
-        return "Please upload an audio file."
+        yield "Please upload an audio file."
+        return
 
     if not check_ffmpeg():
-        return (
+        yield (
             "FFmpeg is not installed.\n\n"
             "FFmpeg is required to decode audio files. Install it:\n"
             "  Windows:  winget install FFmpeg\n"
             "  macOS:    brew install ffmpeg\n\n"
             "Then restart AudioScribe."
         )
+        return
 
     import whisperx
 
     device = get_device()
-    compute_type = get_compute_type(device)
-    lang_code = LANG_CODES.get(language)
-    if language == "Auto-detect":
-        lang_code = None
+    compute_type = get_compute_type(device, compute_type)
+    lang_code = lang_code or None
 
     token = (hf_token or "").strip() or load_token()
 
     print(f"\n{'=' * 60}", flush=True)
     print(f"AudioScribe — Transcribing", flush=True)
     print(f"  Model       : {model_size}", flush=True)
-    print(f"  Language    : {language}", flush=True)
+    print(f"  Language    : {lang_code or 'auto-detect'}", flush=True)
     print(f"  Device      : {device} ({compute_type})", flush=True)
     print(f"  Diarization : {enable_diarization}", flush=True)
     print(f"  HF token    : {'present' if token else 'MISSING'}", flush=True)
@@ -344,23 +754,46 @@ def transcribe(audio_path, language, model_size, enable_diarization, hf_token,
 
     diarization_error = None  # Track diarization errors for transcript
 
-    # Patch pyannote BEFORE loading model — WhisperX's VAD uses pyannote
-    # internally and will fail if the patch isn't applied first.
+    # Patch pyannote BEFORE loading the diarization pipeline — it will fail
+    # on token kwarg mismatches if the patch isn't applied first.
     _patch_pyannote()
 
     try:
         # ---- Load model (cached between runs) ----
         progress(0.05, desc="Loading model...")
         print("[1/4] Loading model...", flush=True)
-        model = _get_model(model_size, device, compute_type, lang_code)
+        model, backend = _get_model(model_size, device, compute_type, lang_code)
         print("       Model loaded OK", flush=True)
 
         # ---- Transcribe ----
         progress(0.2, desc="Transcribing audio...")
         print("[2/4] Transcribing audio...", flush=True)
-        audio = whisperx.load_audio(audio_path)
-        print("       Audio loaded, running transcription...", flush=True)
-        result = model.transcribe(audio, batch_size=16 if device == "cuda" else 4)
+        audio, waveform = _get_audio(audio_path, device)
+        if backend == "trtllm":
+            print("       Audio loaded, running TensorRT-LLM transcription...", flush=True)
+            out = model.transcribe_with_vad(
+                [audio_path], lang_codes=[lang_code], tasks=["transcribe"],
+                initial_prompts=[None], batch_size=24,
+            )
+            result = {
+                "segments": [
+                    {"start": seg["start_time"], "end": seg["end_time"], "text": seg["text"]}
+                    for seg in out[0]
+                ],
+                "language": lang_code,
+            }
+        else:
+            batch_size = _pick_batch_size(device, model_size)
+            print(f"       Audio loaded, batch size {batch_size}", flush=True)
+            asr_lang = lang_code
+            if lang_code is None:
+                fingerprint = _audio_fingerprint(audio)
+                asr_lang = _lang_cache.get(fingerprint)
+                if asr_lang:
+                    print(f"       Using cached language: {asr_lang}", flush=True)
+            result = _transcribe_with_retry(model, audio, asr_lang, batch_size, device)
+            if lang_code is None:
+                _lang_cache[fingerprint] = result["language"]
         detected_lang = result.get("language", lang_code or "unknown")
         seg_count = len(result.get("segments", []))
         print(f"       Detected language: {detected_lang}", flush=True)
@@ -370,15 +803,25 @@ def transcribe(audio_path, language, model_size, enable_diarization, hf_token,
         progress(0.55, desc="Aligning timestamps...")
         print("[3/4] Aligning timestamps...", flush=True)
         try:
-            align_model, metadata = whisperx.load_align_model(
-                language_code=detected_lang, device=device,
-            )
-            result = whisperx.align(
-                result["segments"], align_model, metadata, audio, device,
-                return_char_alignments=False,
+            align_model, metadata = _get_align(detected_lang, device)
+            # Don't spend the CTC forward pass on blips and low-confidence
+            # (usually silence/noise) segments; they keep Whisper's timing
+            to_align, skipped = [], []
+            for seg in result["segments"]:
+                if seg["end"] - seg["start"] > 0.3 and seg.get("avg_logprob", 0) > -1.5:
+                    to_align.append(seg)
+                else:
+                    skipped.append(seg)
+            with torch.inference_mode():
+                aligned = whisperx.align(
+                    to_align, align_model, metadata, waveform, device,
+                    return_char_alignments=False,
+                )
+            aligned["segments"] = sorted(
+                aligned["segments"] + skipped, key=lambda s: s["start"],
             )
-            del align_model, metadata
-            print("       Alignment complete", flush=True)
+            result = aligned
+            print(f"       Alignment complete ({len(skipped)} segments skipped)", flush=True)
         except Exception as e:
             print(f"       Alignment skipped: {e}", flush=True)
 
@@ -392,33 +835,18 @@ def transcribe(audio_path, language, model_size, enable_diarization, hf_token,
                 print("[4/4] Identifying speakers...", flush=True)
                 try:
                     print("       Loading diarization pipeline...", flush=True)
-                    from pyannote.audio import Pipeline as PyannotePipeline
-                    import numpy as np, pandas as pd
-
-                    # Use pyannote directly — avoids whisperx wrapper
-                    # token kwarg mismatch issues.
-                    diar_model_name = (
-                        "pyannote/speaker-diarization-3.1"
-                        if _pyannote_version() < 4
-                        else "pyannote/speaker-diarization-community-1"
-                    )
-                    token_kw = _pyannote_token_kwarg(token)
-                    diar_pipeline = PyannotePipeline.from_pretrained(
-                        diar_model_name, **token_kw,
-                    ).to(torch.device(device))
+                    import pandas as pd
+
+                    diar_pipeline = _get_diarizer(device, token)
 
                     print("       Pipeline loaded, running diarization...", flush=True)
                     # pyannote expects {"waveform": tensor, "sample_rate": int}
-                    SAMPLE_RATE = 16000
-                    if isinstance(audio, np.ndarray):
-                        audio_input = {
-                            "waveform": torch.from_numpy(audio[None, :]),
-                            "sample_rate": SAMPLE_RATE,
-                        }
-                    else:
-                        audio_input = audio
+                    audio_input = {
+                        "waveform": waveform[None, :],
+                        "sample_rate": SAMPLE_RATE,
+                    }
 
-                    diarization = diar_pipeline(audio_input)
+                    diarization = _run_diarization(diar_pipeline, audio_input, device)
 
                     # Convert pyannote Annotation → DataFrame that
                     # whisperx.assign_word_speakers expects.
@@ -435,7 +863,6 @@ def transcribe(audio_path, language, model_size, enable_diarization, hf_token,
                     print(f"       Diarize segments: {len(diarize_segments)} found", flush=True)
 
                     result = whisperx.assign_word_speakers(diarize_segments, result)
-                    del diar_pipeline, diarization, diarize_segments
                     print("       Speaker identification complete.", flush=True)
                 except Exception as e:
                     import traceback
@@ -449,51 +876,61 @@ def transcribe(audio_path, language, model_size, enable_diarization, hf_token,
         else:
             print("[4/4] Speaker diarization disabled — skipping.", flush=True)
 
-        # ---- Build transcript ----
+        segs = result.get("segments", [])
+        if not any(seg.get("text", "").strip() for seg in segs):
+            yield "No speech detected in the audio file."
+            return
+
+        # ---- Build transcript, streaming it to Downloads and the UI ----
         progress(0.9, desc="Saving transcript...")
         print("       Building transcript...", flush=True)
-        lines = []
-
-        # Show diarization error at top of transcript so user sees it
-        if diarization_error:
-            lines.append(f"⚠ Speaker identification failed: {diarization_error}")
-            lines.append("Transcript below has no speaker labels.\n")
-
-        current_speaker = None
-        for seg in result.get("segments", []):
-            speaker = seg.get("speaker")
-            text = seg.get("text", "").strip()
-            if not text:
-                continue
-            if enable_diarization and speaker and speaker != current_speaker:
-                current_speaker = speaker
-                lines.append(f"\n[{speaker}]")
-            lines.append(text)
-
-        transcript = "\n".join(lines).strip()
-        if not transcript:
-            return "No speech detected in the audio file."
-
-        # ---- Save to Downloads ----
-        DOWNLOADS.mkdir(exist_ok=True)
+        if not _DOWNLOADS_READY:
+            DOWNLOADS.mkdir(exist_ok=True)
+            _DOWNLOADS_READY = True
         audio_name = pathlib.Path(audio_path).stem
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        out_file = DOWNLOADS / f"{audio_name}_{timestamp}.txt"
-        out_file.write_text(transcript, encoding="utf-8")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        out_file = os.fspath(DOWNLOADS) + os.sep + f"{audio_name}_{timestamp}.txt"
+
+        # At most one speaker header plus one text line per segment, plus
+        # the two-line diarization warning
+        lines = [None] * (2 * len(segs) + 2)
+        i = 0
+
+        # Line-buffered so each line reaches disk as soon as it's written
+        with open(out_file, "w", encoding="utf-8", buffering=1) as f:
+            # Show diarization error at top of transcript so user sees it
+            if diarization_error:
+                lines[0] = f"⚠ Speaker identification failed: {diarization_error}"
+                lines[1] = "Transcript below has no speaker labels.\n"
+                f.write(f"{lines[0]}\n{lines[1]}\n")
+                i = 2
+
+            current_speaker = None
+            for n, seg in enumerate(segs, 1):
+                if not (text := seg.get("text", "").strip()):
+                    continue
+                speaker = seg.get("speaker")
+                if enable_diarization and speaker and speaker != current_speaker:
+                    current_speaker = speaker
+                    lines[i] = f"\n[{speaker}]" if i else f"[{speaker}]"
+                    f.write(lines[i] + "\n")
+                    i += 1
+                lines[i] = text
+                f.write(text + "\n")
+                i += 1
+                # Refresh the UI in steps — re-sending the whole text on
+                # every segment would be quadratic on long files
+                if n % _STREAM_EVERY == 0:
+                    yield "\n".join(lines[:i])
         print(f"\nTranscript saved to: {out_file}\n", flush=True)
 
-        if device == "cuda":
-            torch.cuda.empty_cache()
-
         progress(1.0, desc="Done!")
-        return transcript
+        yield "\n".join(lines[:i]).strip()
 
     except Exception as e:
-        if device == "cuda":
-            torch.cuda.empty_cache()
         msg = str(e)
         if "out of memory" in msg.lower():
-            return (
+            yield (
                 "Out of GPU memory.\n\n"
                 "Try a smaller model:\n"
                 "  tiny  — fastest, works on any hardware\n"
@@ -501,13 +938,14 @@ def transcribe(audio_path, language, model_size, enable_diarization, hf_token,
                 "  small — better accuracy, needs more memory\n\n"
                 "Or close other GPU-intensive applications."
             )
+            return
         hints = [
             "Try a smaller model (e.g. 'tiny')",
             "Ensure the audio file is not corrupted",
         ]
         if "ffmpeg" in msg.lower() or "FileNotFoundError" in msg:
             hints.insert(0, "Install FFmpeg:  winget install FFmpeg")
-        return (
+        yield (
             f"Transcription failed: {msg}\n\n"
             "Suggestions:\n" + "\n".join(f"  - {h}" for h in hints)
         )
@@ -532,11 +970,15 @@ class _BatchProgress:
         return args[0] if args else iter([])
 
 
-def transcribe_batch(files, language, model_size, enable_diarization, hf_token,
-                     progress=gr.Progress()):
-    """Transcribe multiple audio files in sequence (batch mode)."""
+def transcribe_batch(files, lang_code, model_size, enable_diarization, hf_token,
+                     compute_type="auto", progress=gr.Progress()):
+    """Transcribe multiple audio files in sequence (batch mode).
+
+    Yields the finished transcripts so far plus the one in progress.
+    """
     if not files:
-        return "Please upload one or more audio files."
+        yield "Please upload one or more audio files."
+        return
 
     # Normalise file paths — Gradio may return strings, temp-file objects, etc.
     paths = []
@@ -556,31 +998,49 @@ def transcribe_batch(files, language, model_size, enable_diarization, hf_token,
     print(f"AudioScribe — Batch Mode: {total} file(s)", flush=True)
     print(f"{'=' * 60}\n", flush=True)
 
-    for idx, fp in enumerate(paths):
-        name = pathlib.Path(fp).name
-        sub = _BatchProgress(progress, idx / total, 1.0 / total)
+    # The TensorRT-LLM backend decodes from the file path itself, so a
+    # prefetched decode would be wasted
+    device = get_device()
+    prefetch = _get_backend(device, model_size, lang_code or None) != "trtllm"
 
-        try:
-            result = transcribe(fp, language, model_size, enable_diarization,
-                                hf_token, sub)
-            results.append(f"{'=' * 60}\n{name}\n{'=' * 60}\n\n{result}")
-            # Count as success unless it's a known error message
-            if (not result.startswith("Transcription failed")
-                    and result != "No speech detected in the audio file."
-                    and not result.startswith("FFmpeg is not installed")
-                    and not result.startswith("Please upload")):
-                success_count += 1
-        except Exception as e:
-            results.append(
-                f"{'=' * 60}\n{name}\n{'=' * 60}\n\nERROR: {e}"
-            )
+    # finally: a cancelled run or closed client must not leave decoded audio
+    # (pinned host memory plus a device copy) parked in _prefetched
+    try:
+        for idx, fp in enumerate(paths):
+            name = pathlib.Path(fp).name
+            sub = _BatchProgress(progress, idx / total, 1.0 / total)
+            if prefetch and idx + 1 < total:
+                _prefetch_audio(paths[idx + 1], device)
+
+            try:
+                result = ""
+                for result in transcribe(fp, lang_code, model_size, enable_diarization,
+                                         hf_token, compute_type, sub):
+                    yield "\n\n".join(
+                        results + [f"{'=' * 60}\n{name}\n{'=' * 60}\n\n{result}"]
+                    )
+                results.append(f"{'=' * 60}\n{name}\n{'=' * 60}\n\n{result}")
+                # Count as success unless it's a known error message
+                if (not result.startswith("Transcription failed")
+                        and result != "No speech detected in the audio file."
+                        and not result.startswith("FFmpeg is not installed")
+                        and not result.startswith("Please upload")):
+                    success_count += 1
+            except Exception as e:
+                results.append(
+                    f"{'=' * 60}\n{name}\n{'=' * 60}\n\nERROR: {e}"
+                )
+    finally:
+        for future in _prefetched.values():
+            future.cancel()
+        _prefetched.clear()
 
     progress(1.0, desc=f"Done! {success_count}/{total} files processed.")
     header = (
         f"BATCH COMPLETE: {success_count}/{total} files transcribed successfully.\n"
         f"All transcripts saved to ~/Downloads/\n\n"
     )
-    return header + "\n\n".join(results)
+    yield header + "\n\n".join(results)
 
 
 # ---------------------------------------------------------------------------
@@ -649,8 +1109,8 @@ def build_ui():
                         )
 
                 language = gr.Dropdown(
-                    choices=["Auto-detect"] + LANGUAGES,
-                    value="English",
+                    choices=LANG_CHOICES,
+                    value="en",
                     label="Language",
                 )
                 model_size = gr.Dropdown(
@@ -679,6 +1139,16 @@ def build_ui():
                     token_status = gr.Textbox(label="Status", interactive=False)
                     save_btn.click(fn=save_token, inputs=hf_token, outputs=token_status)
 
+                with gr.Accordion("Advanced", open=False):
+                    compute_type = gr.Dropdown(
+                        choices=COMPUTE_TYPES,
+                        value="auto",
+                        label="Compute Type (GPU only)",
+                    )
+                    ffmpeg_btn = gr.Button("Re-check FFmpeg")
+                    ffmpeg_status = gr.Textbox(label="FFmpeg", interactive=False)
+                    ffmpeg_btn.click(fn=recheck_ffmpeg, outputs=ffmpeg_status)
+
             with gr.Column(scale=2):
                 output = gr.Textbox(
                     label="Transcript",
@@ -687,12 +1157,14 @@ def build_ui():
 
         transcribe_btn.click(
             fn=transcribe,
-            inputs=[audio_input, language, model_size, enable_diarization, hf_token],
+            inputs=[audio_input, language, model_size, enable_diarization, hf_token,
+                    compute_type],
             outputs=output,
         )
         batch_btn.click(
             fn=transcribe_batch,
-            inputs=[file_input, language, model_size, enable_diarization, hf_token],
+            inputs=[file_input, language, model_size, enable_diarization, hf_token,
+                    compute_type],
             outputs=output,
         )
 
@@ -783,7 +1255,17 @@ def main():
         print("           brew install ffmpeg (macOS)\n", flush=True)
 
     app = build_ui()
-    app.queue()
+    # Patch pyannote once here, on the main thread, before the warm-up thread
+    # starts — so the first request can never see a half-applied patch.
+    _patch_pyannote()
+    threading.Thread(target=_warm_up_model, daemon=True).start()
+    # One transcription at a time — concurrent runs thrash the GPU and OOM
+    # on the large models.  A short queue rejects floods instead of piling
+    # them up, and closing the API stops requests that bypass the queue.
+    if int(gr.__version__.split(".")[0]) >= 4:
+        app.queue(default_concurrency_limit=1, max_size=4, api_open=False)
+    else:
+        app.queue(concurrency_count=1, max_size=4, api_open=False)
     app.launch(
         server_name="127.0.0.1",
         server_port=7860,